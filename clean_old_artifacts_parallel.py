@@ -1,14 +1,39 @@
-import subprocess
 import argparse
 import json
 import os
 import sys
 import fnmatch
-import uuid
+import functools
+import re
 import logging
+import atexit
+import queue
 import csv
+import asyncio
 from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import quote
+
+import aiohttp
+import ijson
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+ARTIFACT_QUEUE_SIZE = 1000
+SEARCH_READ_SIZE = 64 * 1024
+DELETE_RETRIES = 3
+DELETE_RETRY_BACKOFF = 0.5
+DELETE_RETRY_STATUSES = {429, 500, 502, 503, 504}
+EXCLUSION_CACHE_SIZE = 100_000
+DEFAULT_MAX_THREADS = 64
+HTTP_CONNECT_TIMEOUT = 30
+HTTP_READ_TIMEOUT = 300
+AQL_INCLUDE_FIELDS = ("repo", "path", "name")
+CSV_HEADERS = ("Repository", "Path", "Status", "Exclusion Pattern", "Error")
 
 def setup_logger():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -26,44 +51,16 @@ def setup_logger():
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(formatter)
 
-    logger.addHandler(ch)
-    logger.addHandler(fh)
+    # Records go through a queue to a single listener thread, so the event
+    # loop never blocks on stdout or the log file.
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, ch, fh, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
-    return logger, timestamp
-
-def jfrog_cli_configure(server_id, url, token, logger):
-    logger.info(f"Configuring JFrog CLI with server ID '{server_id}'...")
-    try:
-        result = subprocess.run(
-            ["jf", "config", "show"],
-            capture_output=True, text=True, check=True
-        )
-        if server_id in result.stdout:
-            logger.info(f"Server '{server_id}' already configured, skipping add.")
-            return
-    except subprocess.CalledProcessError:
-        pass
-
-    cmd = [
-        "jf", "config", "add", server_id,
-        "--url", url,
-        "--access-token", token,
-        "--interactive=false"
-    ]
-
-    try:
-        subprocess.run(cmd, check=True)
-        logger.info(f"Successfully added JFrog CLI server '{server_id}'.")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to configure JFrog CLI: {e}")
-        sys.exit(1)
+    logger.addHandler(QueueHandler(log_queue))
 
-    try:
-        subprocess.run(["jf", "config", "use", server_id], check=True)
-        logger.info(f"Using '{server_id}' as default server.")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to set default server: {e}")
-        sys.exit(1)
+    return logger, timestamp
 
 def load_exclusion_patterns(json_path, logger):
     if not os.path.exists(json_path):
@@ -75,96 +72,347 @@ def load_exclusion_patterns(json_path, logger):
     logger.info(f"Loaded {len(patterns)} exclusion patterns from {json_path}")
     return patterns
 
-def is_excluded(full_path, exclusion_patterns, matched_patterns):
-    for pattern in exclusion_patterns:
-        if fnmatch.fnmatch(full_path, pattern):
-            matched_patterns.add(pattern)
-            return True
-    return False
+def split_server_side_patterns(patterns):
+    # Only patterns with a literal repository and directory translate exactly
+    # into AQL; everything else is still matched client-side.
+    excluded_repos = {}
+    aql_clauses = []
+    client_patterns = []
+    for pattern in patterns:
+        repo, _, rest = pattern.partition("/")
+        directory = rest.rpartition("/")[0]
+        if not is_literal_glob(repo):
+            client_patterns.append(pattern)
+        elif rest in ("*", "**"):
+            excluded_repos[repo] = pattern
+        elif is_directory_pattern(pattern) and directory and is_literal_glob(directory):
+            aql_clauses.append({"$or": [
+                {"repo": {"$ne": repo}},
+                {"$and": [{"path": {"$ne": directory}}, {"path": {"$nmatch": f"{directory}/*"}}]}
+            ]})
+        else:
+            client_patterns.append(pattern)
+    return excluded_repos, aql_clauses, client_patterns
 
-def get_repositories(logger):
-    logger.info("Fetching repository configurations...")
+def is_literal_glob(value):
+    return bool(value) and not any(c in value for c in "*?[")
+
+def load_aql_spec(spec_path, logger):
+    if not os.path.exists(spec_path):
+        logger.error(f"AQL spec file not found: {spec_path}")
+        sys.exit(1)
+    with open(spec_path, "r") as f:
+        aql_spec = f.read()
     try:
-        result = subprocess.run(
-            ["jf", "rt", "curl", "-XGET", "/api/repositories/configurations"],
-            capture_output=True, text=True, check=True
+        json.loads(aql_spec)
+    except json.JSONDecodeError:
+        logger.error(f"Failed to parse AQL spec file: {spec_path}")
+        sys.exit(1)
+    return aql_spec
+
+def build_aql_queries(aql_spec, spec_vars, aql_clauses):
+    # Same ${name} substitution as 'jf rt search --spec-vars', then one AQL
+    # query per file spec, extended with any server-side exclusions.
+    for name, value in spec_vars.items():
+        aql_spec = aql_spec.replace(f"${{{name}}}", json.dumps(value)[1:-1])
+    spec = json.loads(aql_spec)
+    include = ", ".join(json.dumps(field) for field in AQL_INCLUDE_FIELDS)
+    queries = []
+    for file_spec in spec.get("files", []):
+        criteria = file_spec.get("aql", {}).get("items.find")
+        if criteria is None:
+            continue
+        if aql_clauses:
+            criteria["$and"] = criteria.get("$and", []) + aql_clauses
+        queries.append(f"items.find({json.dumps(criteria)}).include({include})")
+    return queries
+
+def artifact_path(item):
+    if item.get("path", ".") == ".":
+        return f"{item['repo']}/{item['name']}"
+    return f"{item['repo']}/{item['path']}/{item['name']}"
+
+def compile_exclusion_patterns(patterns):
+    # Patterns such as "repo/dir/*" or "repo/dir/**" can only match on the
+    # directory part of a path, so their result is cached per directory and
+    # shared by every artifact below it.
+    directory_patterns = [p for p in patterns if is_directory_pattern(p)]
+    path_patterns = [p for p in patterns if not is_directory_pattern(p)]
+    match_path = compile_matcher(path_patterns)
+    match_directory_prefix = compile_matcher(directory_patterns)
+
+    @functools.lru_cache(maxsize=EXCLUSION_CACHE_SIZE)
+    def match_directory(dirname):
+        return match_directory_prefix(dirname + "/")
+
+    def match_exclusion(full_path):
+        dirname, sep, _ = full_path.rpartition("/")
+        pattern = match_directory(dirname) if sep else None
+        return pattern or match_path(full_path)
+
+    return match_exclusion
+
+def is_directory_pattern(pattern):
+    dirname, sep, basename = pattern.rpartition("/")
+    return bool(sep and dirname) and basename in ("*", "**")
+
+def compile_matcher(patterns):
+    # One combined regex answers "is it excluded"; the per-pattern regexes
+    # are only consulted on a hit to report which pattern matched.
+    translated = [fnmatch.translate(pattern) for pattern in patterns]
+    compiled = [(pattern, re.compile(regex)) for pattern, regex in zip(patterns, translated)]
+    combined = re.compile("|".join(f"(?:{regex})" for regex in translated)) if translated else None
+
+    def match(full_path):
+        if combined is None or not combined.match(full_path):
+            return None
+        for pattern, regex in compiled:
+            if regex.match(full_path):
+                return pattern
+        return None
+
+    return match
+
+def is_excluded(full_path, exclusion_matcher, matched_patterns):
+    pattern = exclusion_matcher(full_path)
+    if pattern is None:
+        return False
+    matched_patterns.add(pattern)
+    return True
+
+class ArtifactoryClient:
+    def __init__(self, base_url, token, max_connections):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.max_connections = max_connections
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=HTTP_CONNECT_TIMEOUT,
+                                          sock_read=HTTP_READ_TIMEOUT)
         )
-        data = json.loads(result.stdout)
-        repos = []
-        for rclass in ["LOCAL", "FEDERATED"]:
-            for repo in data.get(rclass, []):
-                repos.append({
-                    "key": repo["key"],
-                    "class": repo["rclass"]
-                })
-        return repos
-    except subprocess.CalledProcessError as e:
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def artifact_url(self, path):
+        return f"{self.base_url}/{quote(path)}"
+
+    def get(self, endpoint):
+        return self.session.get(f"{self.base_url}{endpoint}")
+
+    def search_aql(self, aql_query):
+        return self.session.post(f"{self.base_url}/api/search/aql", data=aql_query,
+                                 headers={"Content-Type": "text/plain"})
+
+    def delete(self, path):
+        return self.session.delete(self.artifact_url(path))
+
+async def get_repositories(client, logger):
+    logger.info("Fetching repository configurations...")
+    try:
+        async with client.get("/api/repositories/configurations") as response:
+            response.raise_for_status()
+            data = json_loads(await response.read())
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"Failed to fetch repositories: {e}")
         sys.exit(1)
     except json.JSONDecodeError:
         logger.error("Failed to parse repository list JSON.")
         sys.exit(1)
+    repos = []
+    for rclass in ["LOCAL", "FEDERATED"]:
+        for repo in data.get(rclass, []):
+            repos.append({
+                "key": repo["key"],
+                "class": repo["rclass"]
+            })
+    return repos
 
 def print_table(headers, rows, logger):
-    col_widths = [max(len(str(cell)) for cell in [header] + [row[i] for row in rows]) for i, header in enumerate(headers)]
-    line = "+" + "+".join("-" * (w + 2) for w in col_widths) + "+"
-    header_row = "| " + " | ".join(f"{headers[i]:<{col_widths[i]}}" for i in range(len(headers))) + " |"
+    str_rows = [tuple(map(str, row)) for row in rows]
+    col_widths = [len(header) for header in headers]
+    for row in str_rows:
+        for i, cell in enumerate(row):
+            if len(cell) > col_widths[i]:
+                col_widths[i] = len(cell)
 
+    line = "+" + "+".join("-" * (w + 2) for w in col_widths) + "+"
     logger.info(line)
-    logger.info(header_row)
+    logger.info(format_table_row(headers, col_widths))
     logger.info(line)
-    for row in rows:
-        row_str = "| " + " | ".join(f"{str(row[i]):<{col_widths[i]}}" for i in range(len(row))) + " |"
-        logger.info(row_str)
+    for row in str_rows:
+        logger.info(format_table_row(row, col_widths))
     logger.info(line)
 
-def get_old_artifacts(spec_path, spec_timeframe, repo, logger):
-    if not os.path.exists(spec_path):
-        logger.error(f"AQL spec file not found: {spec_path}")
-        sys.exit(1)
+def format_table_row(cells, col_widths):
+    return "| " + " | ".join(cell.ljust(width) for cell, width in zip(cells, col_widths)) + " |"
 
-    spec_vars = f"timeframe={spec_timeframe};repo={repo}"
-    command = ["jf", "rt", "search", "--spec", spec_path, "--spec-vars", spec_vars]
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        logger.error("Search using spec file failed:")
-        logger.error(e.stderr.strip())
-        return None
+async def get_old_artifacts(client, aql_spec, spec_timeframe, repo, aql_clauses, logger):
+    spec_vars = {"timeframe": spec_timeframe, "repo": repo}
+    for aql_query in build_aql_queries(aql_spec, spec_vars, aql_clauses):
+        async with client.search_aql(aql_query) as response:
+            if response.status >= 400:
+                logger.error("Search using AQL failed:")
+                logger.error(f"{response.status} {response.reason}: {(await response.text()).strip()}")
+                continue
+            async for item in parse_artifacts(response.content, logger):
+                yield {**item, "path": artifact_path(item)}
+
+async def parse_artifacts(search_stream, logger):
+    # Stream items off the response instead of loading it whole; the
+    # first byte tells whether the results are a bare list or wrapped in a dict.
+    chunk = await search_stream.read(SEARCH_READ_SIZE)
+    while chunk and chunk.isspace():
+        chunk = await search_stream.read(SEARCH_READ_SIZE)
+    head = chunk.lstrip()[:1]
+    if not head:
+        return
+    if head == b"[":
+        prefix = "item"
+    elif head == b"{":
+        prefix = "results.item"
+    else:
+        logger.warning("Unexpected data format in search output.")
+        return
 
-def parse_artifacts(search_output, logger):
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, prefix)
     try:
-        data = json.loads(search_output)
-        if isinstance(data, list):
-            return data
-        elif isinstance(data, dict) and "results" in data:
-            return data["results"]
-        else:
-            logger.warning("Unexpected data format in search output.")
-            return []
-    except json.JSONDecodeError:
+        while chunk:
+            parser.send(chunk)
+            for item in items:
+                yield item
+            del items[:]
+            chunk = await search_stream.read(SEARCH_READ_SIZE)
+        parser.close()
+        for item in items:
+            yield item
+    except ijson.JSONError:
         logger.error("Failed to parse search response.")
-        return []
 
-def build_delete_command(path, dry_run):
-    cmd = ["jf", "rt", "del", path, "--quiet"]
+async def search_repository(args, client, aql_spec, aql_clauses, repo, exclusion_matcher, delete_queue, search_slots,
+                            csv_writer, logger):
+    # Exclusions are checked as items stream in, and only the paths to delete
+    # cross a queue, so each artifact costs one queue hop at most.
+    async with search_slots:
+        logger.info(f"Processing repository: {repo['key']} ({repo['class']})")
+        count = 0
+        seen_paths = set()
+        try:
+            async for item in get_old_artifacts(client, aql_spec, args.older_than, repo["key"], aql_clauses, logger):
+                count += 1
+                path = item.get("path", "")
+                if path in seen_paths:
+                    continue
+                seen_paths.add(path)
+                matched_patterns = set()
+                if is_excluded(path, exclusion_matcher, matched_patterns):
+                    logger.info("[SKIP] Excluded by pattern: %s", path)
+                    csv_writer.writerow((repo["key"], path, "skipped", ", ".join(matched_patterns), ""))
+                    continue
+                await delete_queue.put((repo["key"], path))
+        except Exception as exc:
+            logger.error(f"Unexpected error while searching {repo['key']}: {exc}")
+
+        if count:
+            logger.info(f"{count} artifact(s) found in {repo['key']}.")
+            if count > len(seen_paths):
+                logger.info(f"{count - len(seen_paths)} duplicate path(s) collapsed in {repo['key']}.")
+        else:
+            logger.info(f"No matching artifacts found in {repo['key']}.")
+
+async def delete_artifact(client, path, dry_run, logger):
+    url = client.artifact_url(path)
     if dry_run:
-        cmd.append("--dry-run")
-    return cmd
+        logger.info("[DRYRUN-COMPLETE] DELETE %s", url)
+        return True, ""
+
+    error_msg = ""
+    for attempt in range(DELETE_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(DELETE_RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            async with client.delete(path) as response:
+                if response.status < 400:
+                    logger.info("[DELETED] DELETE %s", url)
+                    return True, ""
+                error_msg = f"{response.status} {response.reason} for url: {url}"
+                if response.status not in DELETE_RETRY_STATUSES:
+                    break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error_msg = str(e) or type(e).__name__
+
+    logger.error("[ERROR] Delete failed: DELETE %s - %s", url, error_msg)
+    return False, error_msg
+
+async def delete_worker(client, dry_run, delete_queue, csv_writer, logger):
+    while True:
+        target = await delete_queue.get()
+        if target is None:
+            return
+        repo_key, path = target
+        try:
+            success, error_msg = await delete_artifact(client, path, dry_run, logger)
+            status = "deleted" if success else "error"
+            csv_writer.writerow((repo_key, path, status, "", error_msg))
+        except Exception as exc:
+            logger.error("Unexpected error while deleting %s: %s", path, exc)
+            csv_writer.writerow((repo_key, path, "Error", "", str(exc)))
+
+async def process_repositories(args, client, aql_spec, aql_clauses, repos, exclusion_matcher, csv_writer, logger):
+    # Searches feed a bounded queue, so deletions start while searches are
+    # still running; a fixed set of delete workers drains it instead of one
+    # task per artifact.
+    delete_queue = asyncio.Queue(maxsize=ARTIFACT_QUEUE_SIZE)
+    search_slots = asyncio.Semaphore(args.threads)
+
+    workers = [
+        asyncio.create_task(delete_worker(client, args.dry_run, delete_queue, csv_writer, logger))
+        for _ in range(args.threads)
+    ]
+    await asyncio.gather(*(
+        search_repository(args, client, aql_spec, aql_clauses, repo, exclusion_matcher, delete_queue, search_slots,
+                          csv_writer, logger)
+        for repo in repos
+    ))
+
+    for _ in workers:
+        await delete_queue.put(None)
+    await asyncio.gather(*workers)
+
+async def clean_up(args, aql_spec, aql_clauses, excluded_repos, exclusion_matcher, csv_writer, logger):
+    base_url = f"{args.artifactory_url.rstrip('/')}/artifactory"
+    # Searches hold a connection while their results stream in, so leave the
+    # delete workers their own share of the pool.
+    async with ArtifactoryClient(base_url, args.access_token, args.threads * 2) as client:
+        repos = await get_repositories(client, logger)
+        if not repos:
+            logger.info("No LOCAL or FEDERATED repositories found.")
+            return
 
-def execute_delete(cmd, logger):
+        logger.info("Repositories discovered:")
+        repo_rows = [(r["key"], r["class"]) for r in repos]
+        print_table(["Repository", "Class"], repo_rows, logger)
+
+        for repo in repos:
+            if repo["key"] in excluded_repos:
+                logger.info(f"[SKIP] Repository excluded by pattern: {repo['key']} ({excluded_repos[repo['key']]})")
+        repos = [r for r in repos if r["key"] not in excluded_repos]
+
+        await process_repositories(args, client, aql_spec, aql_clauses, repos, exclusion_matcher, csv_writer, logger)
+
+def default_thread_count():
+    # Searches and deletes are I/O-bound, so scale well past the CPU count.
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        if "--dry-run" in cmd:
-            logger.info(f"[DRYRUN-COMPLETE] {' '.join(cmd)}")
-        else:
-            logger.info(f"[DELETED] {' '.join(cmd)}")
-        return True, ""
-    except subprocess.CalledProcessError as e:
-        error_msg = e.stderr.strip() if e.stderr else "Unknown error"
-        logger.error(f"[ERROR] Delete failed: {' '.join(cmd)} - {error_msg}")
-        return False, error_msg
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return min(DEFAULT_MAX_THREADS, cpus * 4)
 
 def main():
     logger, timestamp = setup_logger()
@@ -180,91 +428,35 @@ def main():
                         help="Path to AQL spec file")
     parser.add_argument("--dry-run", action="store_true",
                         help="List deletions without executing them")
-    parser.add_argument("--threads", type=int, default=4,
-                        help="Number of parallel threads to use for deletion")
+    parser.add_argument("--threads", type=int,
+                        help="Maximum number of concurrent searches and deletions "
+                             "(default: 4 per available CPU)")
+    parser.add_argument("--max-threads", type=int, default=DEFAULT_MAX_THREADS,
+                        help="Upper bound applied to --threads")
+    parser.add_argument("--server-side-exclusions", action="store_true",
+                        help="Apply exclusions in the AQL query where possible; "
+                             "artifacts excluded this way are not listed in the CSV report")
 
     args = parser.parse_args()
-
-    server_id = f"cli-config-{uuid.uuid4().hex[:8]}"
-    jfrog_cli_configure(server_id, args.artifactory_url, args.access_token, logger)
+    args.threads = max(1, min(args.threads or default_thread_count(), args.max_threads))
+    logger.info(f"Using up to {args.threads} concurrent searches and deletions")
 
     exclusion_patterns = load_exclusion_patterns(args.exclusions_file, logger)
+    aql_spec = load_aql_spec(args.aql_spec, logger)
 
-    repos = get_repositories(logger)
-    if not repos:
-        logger.info("No LOCAL or FEDERATED repositories found.")
-        return
-
-    logger.info("Repositories discovered:")
-    repo_rows = [(r["key"], r["class"]) for r in repos]
-    print_table(["Repository", "Class"], repo_rows, logger)
+    excluded_repos, aql_clauses = {}, []
+    if args.server_side_exclusions:
+        excluded_repos, aql_clauses, exclusion_patterns = split_server_side_patterns(exclusion_patterns)
+        logger.info(f"{len(excluded_repos) + len(aql_clauses)} exclusion pattern(s) applied server-side, "
+                    f"{len(exclusion_patterns)} matched client-side")
+    exclusion_matcher = compile_exclusion_patterns(exclusion_patterns)
 
+    # Rows are written as they are produced rather than collected in memory.
     csv_filename = f"clean-up-{timestamp}.csv"
-    csv_records = []
-
-    for repo in repos:
-        logger.info(f"Processing repository: {repo['key']} ({repo['class']})")
-        raw_output = get_old_artifacts(args.aql_spec, args.older_than, repo["key"], logger)
-        if not raw_output:
-            continue
-
-        artifacts = parse_artifacts(raw_output, logger)
-        if not artifacts:
-            logger.info(f"No matching artifacts found in {repo['key']}.")
-            continue
-
-        logger.info(f"{len(artifacts)} artifact(s) found in {repo['key']}. Checking exclusions...")
-
-        delete_commands = []
-
-        for item in artifacts:
-            path = item.get("path", "")
-            matched_patterns = set()
-            if is_excluded(path, exclusion_patterns, matched_patterns):
-                logger.info(f"[SKIP] Excluded by pattern: {path}")
-                csv_records.append({
-                    "Repository": repo["key"],
-                    "Path": path,
-                    "Status": "skipped",
-                    "Exclusion Pattern": ", ".join(matched_patterns),
-                    "Error": ""
-                })
-                continue
-
-            cmd = build_delete_command(path, args.dry_run)
-            delete_commands.append(cmd)
-
-        with ThreadPoolExecutor(max_workers=args.threads) as executor:
-            future_to_cmd = {executor.submit(execute_delete, cmd, logger): cmd for cmd in delete_commands}
-            for future in as_completed(future_to_cmd):
-                cmd = future_to_cmd[future]
-                try:
-                    success, error_msg = future.result()
-                    status = "deleted" if success else "error"
-                    csv_records.append({
-                        "Repository": repo["key"],
-                        "Path": cmd[3],  # path
-                        "Status": status,
-                        "Exclusion Pattern": "",
-                        "Error": error_msg
-                    })
-                except Exception as exc:
-                    logger.error(f"Unexpected error while deleting {cmd[3]}: {exc}")
-                    csv_records.append({
-                        "Repository": repo["key"],
-                        "Path": cmd[3],
-                        "Status": "Error",
-                        "Exclusion Pattern": "",
-                        "Error": str(exc)
-                    })
-
-    # Write CSV
-    csv_headers = ["Repository", "Path", "Status", "Exclusion Pattern", "Error"]
     with open(csv_filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=csv_headers, delimiter=';')
-        writer.writeheader()
-        for row in csv_records:
-            writer.writerow(row)
+        csv_writer = csv.writer(f, delimiter=';')
+        csv_writer.writerow(CSV_HEADERS)
+        asyncio.run(clean_up(args, aql_spec, aql_clauses, excluded_repos, exclusion_matcher, csv_writer, logger))
 
     logger.info(f"CSV report generated: {csv_filename}")
 